@@ -5,30 +5,45 @@ Auto-collects Microsoft/Power Platform news and syncs to Planka
 """
 
 from __future__ import annotations
+import asyncio
+import json
 import os
-from typing import Optional, Dict, List, Set, Any
-from datetime import datetime
+import re
+from typing import Optional, Dict, List, Set, Tuple, Any
+from datetime import datetime, timezone
 from dataclasses import dataclass
-import requests
+import aiohttp
+import ahocorasick
+import orjson
 import feedparser
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
 from dotenv import load_dotenv
-import pytz
 
 load_dotenv()
 
 FeedEntry = Dict[str, Any]
 PlankaCard = Dict[str, Any]
 Headers = Dict[str, str]
+FeedCache = Dict[str, Dict[str, str]]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Config:
-    """Configuration loaded from environment variables."""
-    PLANKA_URL: str = os.getenv("PLANKA_URL", "")
-    PLANKA_TOKEN: Optional[str] = os.getenv("PLANKA_TOKEN")
-    BOARD_ID: str = os.getenv("PLANKA_BOARD_ID", "")
-    TODO_LIST_ID: str = os.getenv("PLANKA_TODO_LIST_ID", "")
+    """Planka connection settings."""
+    PLANKA_URL: str
+    PLANKA_TOKEN: Optional[str]
+    BOARD_ID: str
+    TODO_LIST_ID: str
+    
+    @classmethod
+    def from_env(cls) -> Config:
+        """Read configuration from environment variables."""
+        return cls(
+            PLANKA_URL=os.getenv("PLANKA_URL", ""),
+            PLANKA_TOKEN=os.getenv("PLANKA_TOKEN"),
+            BOARD_ID=os.getenv("PLANKA_BOARD_ID", ""),
+            TODO_LIST_ID=os.getenv("PLANKA_TODO_LIST_ID", ""),
+        )
     
     def __post_init__(self):
         """Validate required configuration."""
@@ -42,14 +57,14 @@ class Config:
             raise ValueError("PLANKA_TODO_LIST_ID environment variable is required")
 
 
-FEEDS: Dict[str, str] = {
-    "Microsoft Tech Community": "https://techcommunity.microsoft.com/rss-feeds",
-    "Power Platform Blog": "https://powerplatform.microsoft.com/en-us/blog/feed/",
-    "Microsoft 365 Blog": "https://www.microsoft.com/en-us/microsoft-365/blog/feed/",
-    "Azure Blog": "https://azure.microsoft.com/en-us/blog/feed/",
-    "Microsoft Learn": "https://docs.microsoft.com/api/search/rss?search=Power%20Platform&locale=en-us",
-    "Dynamics 365 Blog": "https://cloudblogs.microsoft.com/dynamics365/feed/",
-}
+FEEDS: Tuple[Tuple[str, str], ...] = (
+    ("Microsoft Tech Community", "https://techcommunity.microsoft.com/rss-feeds"),
+    ("Power Platform Blog", "https://powerplatform.microsoft.com/en-us/blog/feed/"),
+    ("Microsoft 365 Blog", "https://www.microsoft.com/en-us/microsoft-365/blog/feed/"),
+    ("Azure Blog", "https://azure.microsoft.com/en-us/blog/feed/"),
+    ("Microsoft Learn", "https://docs.microsoft.com/api/search/rss?search=Power%20Platform&locale=en-us"),
+    ("Dynamics 365 Blog", "https://cloudblogs.microsoft.com/dynamics365/feed/"),
+)
 
 KEYWORDS: List[str] = [
     "power platform", "copilot", "power apps", "power automate", 
@@ -58,38 +73,156 @@ KEYWORDS: List[str] = [
     "sharepoint", "teams", "azure", "microsoft"
 ]
 
+KEYWORD_AUTOMATON = ahocorasick.Automaton()
+for _keyword in KEYWORDS:
+    KEYWORD_AUTOMATON.add_word(_keyword, _keyword)
+KEYWORD_AUTOMATON.make_automaton()
+
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=10)
+PLANKA_POOL_SIZE = 16
+PLANKA_CONCURRENCY = 5
+ENTRIES_PER_FEED = 5
+SUMMARY_LENGTH = 300
+SUMMARY_HTML_WINDOWS = (4096, 16384)
+URL_PATTERN = re.compile(r"https?://\S+")
+URL_TRAILING_PUNCTUATION = ".,;:!?)]>'\""
+STATE_DIR = os.path.dirname(os.path.abspath(__file__))
+FEED_CACHE_PATH = os.path.join(STATE_DIR, ".feed_cache.json")
+PROCESSED_URLS_PATH = os.path.join(STATE_DIR, ".processed.json")
+PROCESSED_URLS_LIMIT = 1000
+ROOT_ELEMENT_PATTERN = re.compile(rb"<!--.*?-->|<\?.*?\?>|<![^>]*>|<([A-Za-z_][\w.:-]*)", re.DOTALL)
+ENTRY_CLOSE_PATTERN = re.compile(rb"<!\[CDATA\[.*?\]\]>|<!--.*?-->|</(item|entry)\s*>", re.DOTALL)
+FEED_ENTRY_TAGS: Dict[bytes, Tuple[bytes, bytes]] = {
+    b"rss": (b"item", b"</channel></rss>"),
+    b"feed": (b"entry", b"</feed>"),
+}
+
 
 class NewsAggregator:
     def __init__(self, config: Optional[Config] = None) -> None:
-        self.config = config or Config()
+        self.config = config or Config.from_env()
         self.headers: Headers = {
             "Authorization": f"Bearer {self.config.PLANKA_TOKEN}",
             "Content-Type": "application/json"
         }
-        self.processed_urls: Set[str] = set()
+        self.processed_urls: Dict[str, None] = self._load_processed_urls()
+        self._existing_urls: Optional[Set[str]] = None
+        self._run_ts: str = ""
+        self.feed_cache: FeedCache = self._load_feed_cache()
+        self._pending_validators: FeedCache = {}
         
-    def fetch_feed(self, name: str, url: str) -> List[FeedEntry]:
+    def _load_feed_cache(self) -> FeedCache:
+        try:
+            with open(FEED_CACHE_PATH, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+    
+    def _save_feed_cache(self) -> None:
+        self._write_json_atomic(FEED_CACHE_PATH, self.feed_cache)
+    
+    def _load_processed_urls(self) -> Dict[str, None]:
+        try:
+            with open(PROCESSED_URLS_PATH, encoding="utf-8") as f:
+                return dict.fromkeys(json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+    
+    def _save_processed_urls(self) -> None:
+        recent: List[str] = list(self.processed_urls)[-PROCESSED_URLS_LIMIT:]
+        self._write_json_atomic(PROCESSED_URLS_PATH, recent)
+    
+    def _mark_processed(self, url: str) -> None:
+        # Re-insert so links still present in the feeds stay at the recent end.
+        self.processed_urls.pop(url, None)
+        self.processed_urls[url] = None
+    
+    def _write_json_atomic(self, path: str, data: Any) -> None:
+        tmp_path: str = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    
+    async def fetch_feed(self, session: aiohttp.ClientSession, name: str, url: str) -> List[FeedEntry]:
         try:
             print(f"📡 Fetching: {name}")
-            feed = feedparser.parse(url)
+            cached: Dict[str, str] = self.feed_cache.get(url, {})
+            request_headers: Headers = {}
+            if cached.get("etag"):
+                request_headers["If-None-Match"] = cached["etag"]
+            if cached.get("modified"):
+                request_headers["If-Modified-Since"] = cached["modified"]
+            
+            async with session.get(url, headers=request_headers, timeout=REQUEST_TIMEOUT) as response:
+                if response.status == 304:
+                    print(f"💤 Not modified: {name}")
+                    return []
+                body: bytes = await response.read()
+                feed_headers: Headers = {key.lower(): value for key, value in response.headers.items()}
+                feed_headers["content-location"] = str(response.url)
+                validators: Dict[str, str] = {}
+                if response.headers.get("ETag"):
+                    validators["etag"] = response.headers["ETag"]
+                if response.headers.get("Last-Modified"):
+                    validators["modified"] = response.headers["Last-Modified"]
+            truncated: bytes = self._truncate_entries(body, ENTRIES_PER_FEED)
+            feed = feedparser.parse(truncated, response_headers=feed_headers)
+            if feed.bozo and truncated is not body:
+                feed = feedparser.parse(body, response_headers=feed_headers)
+            if response.status == 200:
+                self._pending_validators[url] = validators
             return feed.entries
         except Exception as e:
             print(f"❌ Error fetching {name}: {e}")
             return []
     
+    def _truncate_entries(self, body: bytes, limit: int) -> bytes:
+        root = next((m for m in ROOT_ELEMENT_PATTERN.finditer(body) if m.group(1)), None)
+        if root is None or root.group(1) not in FEED_ENTRY_TAGS:
+            return body
+        entry_tag, closing_tags = FEED_ENTRY_TAGS[root.group(1)]
+        count: int = 0
+        for match in ENTRY_CLOSE_PATTERN.finditer(body, root.end()):
+            if match.group(1) != entry_tag:
+                continue
+            count += 1
+            if count == limit:
+                return body[:match.end()] + closing_tags
+        return body
+    
     def is_relevant(self, title: str, summary: str) -> bool:
-        text: str = f"{title} {summary}".lower()
-        return any(keyword in text for keyword in KEYWORDS)
+        return self._contains_keyword(title.lower()) or self._contains_keyword(summary.lower())
+    
+    @staticmethod
+    def _contains_keyword(text: str) -> bool:
+        return next(KEYWORD_AUTOMATON.iter(text), None) is not None
+    
+    @staticmethod
+    def _html_to_text(html: str) -> str:
+        tree = LexborHTMLParser(html)
+        tree.strip_tags(["script", "style"])
+        return " ".join(tree.text(separator=' ', strip=True).split())
     
     def summarize_article(self, title: str, content: str) -> Dict[str, str]:
-        soup = BeautifulSoup(content, 'html.parser')
-        text: str = soup.get_text(separator=' ', strip=True)
-        summary: str = text[:300] + "..." if len(text) > 300 else text
+        text: str = ""
+        truncated: bool = False
+        for window in SUMMARY_HTML_WINDOWS:
+            text = self._html_to_text(content[:window])
+            truncated = len(content) > window
+            if len(text) > SUMMARY_LENGTH or not truncated:
+                break
+        if not text and truncated:
+            text = self._html_to_text(content)
+            truncated = False
+        if len(text) > SUMMARY_LENGTH or truncated:
+            summary: str = text[:SUMMARY_LENGTH] + "..."
+        else:
+            summary = text
         return {"title": title, "summary": summary}
     
-    def create_planka_card(self, title: str, description: str, url: str, source: str) -> Optional[PlankaCard]:
+    async def create_planka_card(self, planka: aiohttp.ClientSession, title: str, description: str, url: str, source: str) -> Optional[PlankaCard]:
         card_name: str = f"[{source}] {title[:80]}"
-        card_desc: str = f"{description}\n\n🔗 Source: {url}\n📅 Found: {datetime.now(pytz.UTC).strftime('%Y-%m-%d %H:%M')}"
+        card_desc: str = f"{description}\n\n🔗 Source: {url}\n📅 Found: {self._run_ts}"
         
         data: Dict[str, Any] = {
             "name": card_name,
@@ -99,68 +232,128 @@ class NewsAggregator:
         }
         
         try:
-            response = requests.post(
+            async with planka.post(
                 f"{self.config.PLANKA_URL}/lists/{self.config.TODO_LIST_ID}/cards",
-                headers=self.headers,
-                json=data,
-                timeout=10
-            )
-            if response.status_code == 200:
-                print(f"✅ Created card: {card_name[:50]}...")
-                return response.json()
-            else:
-                print(f"❌ Failed: {response.status_code}")
-                return None
+                data=orjson.dumps(data)
+            ) as response:
+                if response.status == 200:
+                    print(f"✅ Created card: {card_name[:50]}...")
+                    return orjson.loads(await response.read())
+                else:
+                    print(f"❌ Failed: {response.status}")
+                    return None
         except Exception as e:
             print(f"❌ Error: {e}")
             return None
     
-    def check_existing_cards(self, url: str) -> bool:
+    async def _create_card_limited(
+        self,
+        semaphore: asyncio.Semaphore,
+        planka: aiohttp.ClientSession,
+        title: str,
+        description: str,
+        url: str,
+        source: str
+    ) -> Optional[PlankaCard]:
+        async with semaphore:
+            return await self.create_planka_card(planka, title, description, url, source)
+    
+    async def _load_existing_urls(self, planka: aiohttp.ClientSession) -> Set[str]:
+        urls: Set[str] = set()
         try:
-            response = requests.get(
-                f"{self.config.PLANKA_URL}/boards/{self.config.BOARD_ID}",
-                headers=self.headers,
-                timeout=10
-            )
-            if response.status_code == 200:
-                data = response.json()
-                cards = data.get("included", {}).get("cards", [])
-                return any(url in card.get("description", "") for card in cards)
+            async with planka.get(
+                f"{self.config.PLANKA_URL}/boards/{self.config.BOARD_ID}"
+            ) as response:
+                if response.status == 200:
+                    data = orjson.loads(await response.read())
+                    cards = data.get("included", {}).get("cards", [])
+                    for card in cards:
+                        for found in URL_PATTERN.findall(card.get("description") or ""):
+                            urls.add(found)
+                            urls.add(found.rstrip(URL_TRAILING_PUNCTUATION))
         except Exception as e:
-            print(f"⚠️ Error checking: {e}")
-        return False
+            print(f"⚠️ Error loading board: {e}")
+        return urls
     
-    def run(self) -> int:
-        print(f"\n🚀 M365-Scout - {datetime.now(pytz.UTC).strftime('%Y-%m-%d %H:%M:%S UTC')}")
+    async def _is_on_board(self, planka: aiohttp.ClientSession, url: str) -> bool:
+        if self._existing_urls is None:
+            self._existing_urls = await self._load_existing_urls(planka)
+        return url in self._existing_urls
+    
+    async def run(self) -> int:
+        started_at: datetime = datetime.now(timezone.utc)
+        self._run_ts = started_at.strftime('%Y-%m-%d %H:%M')
+        print(f"\n🚀 M365-Scout - {started_at.strftime('%Y-%m-%d %H:%M:%S UTC')}")
         print("=" * 60)
         
         new_articles: int = 0
+        self._existing_urls = None
+        self._pending_validators = {}
         
-        for source_name, feed_url in FEEDS.items():
-            entries: List[FeedEntry] = self.fetch_feed(source_name, feed_url)
+        planka_connector = aiohttp.TCPConnector(limit=PLANKA_POOL_SIZE)
+        async with aiohttp.ClientSession() as session, aiohttp.ClientSession(
+            headers=self.headers,
+            connector=planka_connector,
+            timeout=REQUEST_TIMEOUT
+        ) as planka:
+            tasks = [self.fetch_feed(session, name, url) for name, url in FEEDS]
+            feeds: List[List[FeedEntry]] = await asyncio.gather(*tasks)
             
-            for entry in entries[:5]:
-                title: str = entry.get("title", "")
-                link: str = entry.get("link", "")
-                summary: str = entry.get("summary", entry.get("description", ""))
-                
-                if link in self.processed_urls:
-                    continue
-                if self.check_existing_cards(link):
-                    self.processed_urls.add(link)
-                    continue
-                
-                if self.is_relevant(title, summary):
+            pending: List[Dict[str, str]] = []
+            queued: Set[str] = set()
+            feed_links: Dict[str, Set[str]] = {}
+            for (source_name, feed_url), entries in zip(FEEDS, feeds):
+                links: Set[str] = feed_links.setdefault(feed_url, set())
+                for entry in entries[:ENTRIES_PER_FEED]:
+                    title: str = entry.get("title", "")
+                    link: str = entry.get("link") or entry.get("id") or entry.get("guid") or ""
+                    summary: str = entry.get("summary", entry.get("description", ""))
+                    
+                    if not link.startswith(("http://", "https://")):
+                        continue
+                    if link in self.processed_urls:
+                        self._mark_processed(link)
+                        continue
+                    if not self.is_relevant(title, summary):
+                        continue
+                    if await self._is_on_board(planka, link):
+                        self._mark_processed(link)
+                        continue
+                    
+                    links.add(link)
+                    if link in queued:
+                        continue
                     article_data = self.summarize_article(title, summary)
-                    result: Optional[PlankaCard] = self.create_planka_card(
-                        article_data["title"],
-                        article_data["summary"],
-                        link,
-                        source_name
-                    )
-                    if result:
-                        new_articles += 1
-                        self.processed_urls.add(link)
+                    pending.append({**article_data, "link": link, "source": source_name})
+                    queued.add(link)
+            
+            semaphore = asyncio.Semaphore(PLANKA_CONCURRENCY)
+            card_tasks = [
+                self._create_card_limited(
+                    semaphore,
+                    planka,
+                    article["title"],
+                    article["summary"],
+                    article["link"],
+                    article["source"]
+                )
+                for article in pending
+            ]
+            results = await asyncio.gather(*card_tasks, return_exceptions=True)
+            
+            for article, result in zip(pending, results):
+                if isinstance(result, BaseException):
+                    print(f"❌ Error: {result}")
+                elif result:
+                    new_articles += 1
+                    self._mark_processed(article["link"])
+            
+            for feed_url, links in feed_links.items():
+                if feed_url in self._pending_validators and links <= self.processed_urls.keys():
+                    self.feed_cache[feed_url] = self._pending_validators[feed_url]
+        
+        self._save_feed_cache()
+        self._save_processed_urls()
         
         print("=" * 60)
         print(f"✅ Added {new_articles} articles to Planka.")
@@ -168,7 +361,7 @@ class NewsAggregator:
 
 
 def main() -> None:
-    NewsAggregator().run()
+    asyncio.run(NewsAggregator().run())
 
 
 if __name__ == "__main__":